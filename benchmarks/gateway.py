@@ -0,0 +1,104 @@
+"""
+File: gateway.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    Benchmark of gateway event decoding and dispatch throughput,
+    with and without the accelerations enabled by --fast.
+    The dispatch is synthetic: every decoded payload is handed to a trivial handler
+    in its own task, the way discord.py schedules event handlers, it does not run
+    discord.py's ConnectionState parsers, so it measures the JSON codec and the event loop only.
+    Run from the repository root: python3 -m benchmarks.gateway
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from utils import speedups
+
+# Shape of a typical MESSAGE_CREATE gateway payload.
+PAYLOAD = {
+    "op": 0,
+    "s": 42,
+    "t": "MESSAGE_CREATE",
+    "d": {
+        "id": "1392593685035880478",
+        "channel_id": "1392593663724490792",
+        "guild_id": "1392593651841896550",
+        "author": {
+            "id": "1392593675183325246",
+            "username": "peter",
+            "global_name": "Peter Griffin",
+            "avatar": "a_0123456789abcdef0123456789abcdef",
+            "discriminator": "0",
+            "public_flags": 0,
+        },
+        "member": {"roles": ["1", "2", "3"], "joined_at": "2025-07-10T12:00:00.000000+00:00"},
+        "content": ";stats " + "lorem ipsum dolor sit amet " * 8,
+        "timestamp": "2025-07-10T12:00:00.000000+00:00",
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    },
+}
+
+
+async def dispatch(raw: list[bytes], loads) -> float:
+    """Decodes every payload and schedules a trivial handler task for it (synthetic dispatch)."""
+    handled = 0
+
+    async def on_event(data: dict):
+        nonlocal handled
+        handled += len(data["d"]["content"]) > 0
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(on_event(loads(message))) for message in raw]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    assert handled == len(raw)
+    return elapsed
+
+
+def run(name: str, raw: list[bytes], loads, loop_factory=None):
+    decode_start = time.perf_counter()
+    for message in raw:
+        loads(message)
+    decode_time = time.perf_counter() - decode_start
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        dispatch_time = runner.run(dispatch(raw, loads))
+
+    print(
+        f"{name:<16} decode: {len(raw) / decode_time:>12,.0f} events/s   "
+        f"decode+dispatch: {len(raw) / dispatch_time:>12,.0f} events/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway decode and dispatch benchmark.")
+    parser.add_argument("--events", type=int, default=100_000, help="Number of events")
+    args = parser.parse_args()
+
+    raw = [json.dumps(PAYLOAD).encode()] * args.events
+    # discord.py decodes the gateway with orjson whenever it is installed, even without --fast
+    loads = speedups.orjson.loads if speedups.orjson else json.loads
+    run("stdlib", raw, json.loads)
+    run("default", raw, loads)
+
+    if speedups.uvloop is None:
+        print("--fast: uvloop is not installed, same as default")
+        return
+    run("--fast", raw, loads, speedups.uvloop.new_event_loop)
+
+
+if __name__ == "__main__":
+    main()
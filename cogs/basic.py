@@ -17,7 +17,9 @@ class Basic(commands.Cog):
     @discord.app_commands.command(name="prefix", description="Responds prefix command.")
     async def check_prefix(self, interaction: discord.Interaction):
         """Responds to prefix command."""
-        await interaction.response.send_message(f"`{self.bot.config.prefix}`")
+        prefix = self.bot.config.prefix
+        prefixes = [prefix] if isinstance(prefix, str) else prefix
+        await interaction.response.send_message(", ".join(f"`{p}`" for p in prefixes))
 
 
 async def setup(bot):
@@ -1,6 +1,9 @@
 import time
+import asyncio
 import discord
 from utils.logger import logger
+from utils.profiler import SamplingProfiler
+from utils import speedups
 from discord.ext import commands
 from discord import SelectOption, Status, Embed
 
@@ -9,6 +12,14 @@ from discord import SelectOption, Status, Embed
 class Dev(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.profiler: SamplingProfiler | None = None
+        self.profile_task: asyncio.Task | None = None
+
+    async def cog_unload(self):
+        if self.profile_task is not None:
+            self.profile_task.cancel()
+        if self.profiler is not None:
+            self.profiler.stop()
 
     @commands.command()
     @commands.is_owner()
@@ -96,12 +107,43 @@ class Dev(commands.Cog):
             await ctx.reply(f"Cog `{module_name}` has been successfully unloaded.")
             logger.info(f"Cog {module_name} has been successfully unloaded by {ctx.author.id}")
 
+    @commands.command()
+    @commands.is_owner()
+    async def reload_config(self, ctx: commands.Context):
+        """
+        Loads the configuration file again and applies changed settings
+        without restarting the bot.
+
+        :param ctx: The command invocation context.
+        """
+        result = await self.bot.reload_config()
+        if result is None:
+            await ctx.reply("The configuration file is invalid, current settings were kept. Check the logs.")
+            return
+        changes, restart = result
+        embed = Embed(
+            title="Config reloaded",
+            color=discord.Color.orange() if restart else discord.Color.blue(),
+            description="\n".join(
+                f"`{name}`: `{old}` → `{new}`" + (" *(restart required)*" if name in restart else "")
+                for name, (old, new) in changes.items()
+            )[:4096] or "No changes.",
+        )
+        await ctx.reply(embed=embed)
+        logger.info(f"Config reloaded by {ctx.author.id}.")
+
     @commands.command()
     @commands.is_owner()
     async def stats(self, ctx: commands.Context):
         """Displays a brief report"""
         uptime_seconds = round(time.time() - self.bot.config.start_timestamp)
         uptime_str = time.strftime("%H:%M:%S", time.gmtime(uptime_seconds))
+        images = self.bot.images
+        average_ms = (
+            images.processing_time * 1000 / images.processed_count
+            if images.processed_count
+            else 0
+        )
         embed = Embed(
             title=f"Stats: {self.bot.user}",
             color=discord.Color.blue(),
@@ -112,11 +154,126 @@ class Dev(commands.Cog):
         embed.add_field(name="Status:", value=f"`{self.bot.config.status}`", inline=True)
         embed.add_field(name="Cogs:", value=f"`{self.bot.config.cogs_count}`", inline=True)
         embed.add_field(name="Commands:", value=f"`{self.bot.config.slash_commands_count}`", inline=True)
+        embed.add_field(name="Tenant:", value=f"`{self.bot.config.name}`", inline=True)
+        embed.add_field(name="DB queries:", value=f"`{self.bot.db.queries}`", inline=True)
+        embed.add_field(name="HTTP:", value=f"`{self.bot.web.requests}` requests, `{self.bot.web.bytes_received // 1024}` KiB", inline=True)
+        embed.add_field(name="Images:", value=f"`{images.processed_count}` processed, `{images.bytes_saved // 1024}` KiB saved, `{average_ms:.1f}` ms avg", inline=False)
+        embed.add_field(name="Speedups:", value=f"`{', '.join(speedups.status()) or 'none'}`", inline=True)
         embed.add_field(name="Version discord.py:", value=f"`{discord.__version__}`", inline=False)
         embed.set_footer(text=f"{self.bot.user}")
         # fmt: on
         await ctx.reply(embed=embed)
 
+    @commands.command()
+    @commands.is_owner()
+    async def profile_start(self, ctx: commands.Context, seconds: int = 30, memory: str | None = None):
+        """
+        Starts the sampling CPU profiler for the given duration (max 300 seconds)
+        without restarting the bot, e.g. `profile_start 30`.
+        With `profile_start 30 memory` tracemalloc snapshots are taken as well,
+        which slows down allocation-heavy code several times while running.
+
+        :param ctx: The command invocation context.
+        :param seconds: Profiling duration in seconds.
+        :param memory: `memory` to also trace memory allocations.
+        """
+        if self.profiler is not None:
+            await ctx.reply("The profiler is already running, use `profile_stop`.")
+            return
+        seconds = max(1, min(seconds, 300))
+        profiler = SamplingProfiler(trace_memory=memory == "memory")
+        try:
+            profiler.start()
+        except RuntimeError as err:
+            await ctx.reply(f"Cannot start the profiler: {err}")
+            return
+        self.profiler = profiler
+        self.profile_task = asyncio.create_task(self._profile_timeout(ctx, seconds))
+        await ctx.reply(f"Profiling for `{seconds}` seconds{' with memory tracing' if profiler.trace_memory else ''}...")
+        logger.info(f"Profiler started by {ctx.author.id} for {seconds}s.")
+
+    @commands.command()
+    @commands.is_owner()
+    async def profile_stop(self, ctx: commands.Context):
+        """
+        Stops the running profiler before its duration ends and posts the summary.
+
+        :param ctx: The command invocation context.
+        """
+        if self.profiler is None:
+            await ctx.reply("The profiler is not running.")
+            return
+        self.profile_task.cancel()
+        self.profile_task = None
+        await self._profile_report(ctx)
+
+    async def _profile_timeout(self, ctx: commands.Context, seconds: int):
+        await asyncio.sleep(seconds)
+        self.profile_task = None
+        await self._profile_report(ctx)
+
+    async def _profile_report(self, ctx: commands.Context):
+        """Stops the profiler, writes its data to the logs directory and replies with the top hotspots."""
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        stacks_path, memory_path = await asyncio.to_thread(
+            profiler.dump, self.bot.config.logs_dir
+        )
+        hotspots = "\n".join(
+            f"`{percent:5.1f}%` {frame.rsplit('/', 1)[-1]}"
+            for frame, percent in profiler.top_hotspots(10)
+        )
+        allocations = "\n".join(
+            f"`{stat.size_diff / 1024:+.1f} KiB` {stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno}"
+            for stat in profiler.top_allocations(5)
+        )
+        embed = Embed(
+            title="Profile",
+            color=discord.Color.blue(),
+            timestamp=discord.utils.utcnow(),
+        )
+        # fmt: off
+        embed.add_field(name="Duration:", value=f"`{profiler.duration:.1f}s`", inline=True)
+        embed.add_field(name="Samples:", value=f"`{profiler.samples}`", inline=True)
+        embed.add_field(name="CPU hotspots:", value=hotspots[:1024] or "`-`", inline=False)
+        if profiler.trace_memory:
+            embed.add_field(name="Allocations:", value=allocations[:1024] or "`-`", inline=False)
+        embed.set_footer(text=f"{stacks_path.name} | {memory_path.name if memory_path else '-'}")
+        # fmt: on
+        await ctx.reply(embed=embed)
+
+    @commands.command()
+    @commands.is_owner()
+    async def traces(self, ctx: commands.Context, count: int = 5):
+        """
+        Displays the most recent slow traces with the time spent in Discord,
+        HTTP and database calls.
+
+        :param ctx: The command invocation context.
+        :param count: Number of traces to display (max 10).
+        """
+        tracer = self.bot.tracer
+        embed = Embed(
+            title="Slow traces",
+            color=discord.Color.blue(),
+            description=f"Sample rate `{tracer.sample_rate:.0%}`, threshold `{tracer.slow_threshold * 1000:.0f} ms`, traced `{tracer.traced}`",
+            timestamp=discord.utils.utcnow(),
+        )
+        for root in list(tracer.slow_traces)[-max(1, min(count, 10)):][::-1]:
+            lines = [
+                f"`{(child.duration or 0) * 1000:7.1f} ms` {child.name} "
+                + " ".join(f"{key}={value}" for key, value in child.attributes.items() if key != "query")
+                for child in root.spans[1:]
+            ]
+            embed.add_field(
+                name=f"{root.name} - {root.duration * 1000:.0f} ms",
+                value="\n".join(lines)[:1024] or "`no child spans`",
+                inline=False,
+            )
+        if not tracer.slow_traces:
+            embed.add_field(name="-", value="No slow traces recorded.", inline=False)
+        await ctx.reply(embed=embed)
+
     @commands.command()
     @commands.is_owner()
     async def change_presence_status(self, ctx: commands.Context):
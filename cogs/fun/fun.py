@@ -1,13 +1,24 @@
 import io
-import aiohttp
 import discord
 from discord.ext import commands
+from core.tracing import span
 
 
 class Fun(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def process_image(self, data: bytes) -> tuple[bytes, str]:
+        """Processes the image with this bot's current image settings."""
+        snapshot = self.bot.config.snapshot
+        with span("images", bytes=len(data)):
+            return await self.bot.images.process(
+                data,
+                max_dimension=snapshot.image_max_dimension,
+                image_format=snapshot.image_format,
+                quality=snapshot.image_quality,
+            )
+
     @discord.app_commands.command(name="say", description="Bot repeats your message")
     async def say_command(self, interaction: discord.Interaction, message: str):
         await interaction.response.send_message("👍", ephemeral=True)
@@ -16,24 +27,22 @@ class Fun(commands.Cog):
     @discord.app_commands.command(name="cat", description="Send a random cat picture 🐱")
     async def cat_command(self, interaction: discord.Interaction):
         await interaction.response.defer(thinking=False)
-        async with aiohttp.ClientSession() as session:
-            async with session.get("https://cataas.com/cat") as resp:
-                if resp.status != 200:
-                    await interaction.followup.send(f"`cataas.com` is not responding: {resp.status}")
-                    return
-                data = await resp.read()
-        file = discord.File(fp=io.BytesIO(data), filename="cat.png")
+        status, data = await self.bot.web.read("https://cataas.com/cat")
+        if data is None:
+            await interaction.followup.send(f"`cataas.com` is not responding: {status}")
+            return
+        data, ext = await self.process_image(data)
+        file = discord.File(fp=io.BytesIO(data), filename=f"cat.{ext}")
         await interaction.followup.send(file=file)
 
     @discord.app_commands.command(name="catsays", description="Send a random cat saying text 🐱")
     async def cat_says_command(self, interaction: discord.Interaction, text: str = "%20"):
         await interaction.response.defer(thinking=False)
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"https://cataas.com/cat/says/{text}") as resp:
-                if resp.status != 200:
-                    await interaction.followup.send(f"`cataas.com` is not responding: {resp.status}")
-                    return
-                data = await resp.read()
-        file = discord.File(fp=io.BytesIO(data), filename="cat.png")
+        status, data = await self.bot.web.read(f"https://cataas.com/cat/says/{text}")
+        if data is None:
+            await interaction.followup.send(f"`cataas.com` is not responding: {status}")
+            return
+        data, ext = await self.process_image(data)
+        file = discord.File(fp=io.BytesIO(data), filename=f"cat.{ext}")
         await interaction.followup.send(file=file)
 
@@ -12,48 +12,207 @@ Description:
 import os
 import time
 import discord
-from dotenv import load_dotenv
+from dataclasses import dataclass, fields
+from dotenv import dotenv_values
+from core.images import INLINE_FORMATS, is_supported_format
 from utils.logger import logger
 from utils.tools import load_config_file
 from pathlib import Path
 
+# Settings that are only read when the bot starts, changing them requires a restart.
+RESTART_REQUIRED = frozenset(
+    {"case_insensitive", "intents_payload", "http_timeout", "image_workers"}
+)
+STATUSES = ("online", "idle", "dnd", "invisible")
+
+
+def _check(name: str, value, types: tuple, optional: bool = False):
+    if value is None and optional:
+        return value
+    # bool is a subclass of int, it is only accepted where explicitly allowed
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        raise ValueError(f"Config: `{name}` has an invalid value: {value!r}")
+    return value
+
+
+def _check_min(name: str, value, minimum):
+    if value is not None and value < minimum:
+        raise ValueError(f"Config: `{name}` must be at least {minimum}: {value!r}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Validated, immutable settings loaded from the configuration file."""
+
+    mention_everyone: bool
+    mention_replied_user: bool
+    mention_users: bool
+    mention_roles: bool
+    case_insensitive: bool
+    owner_id: int | None
+    owner_ids: tuple[int, ...] | None
+    prefix: str | tuple[str, ...]
+    status: str | None
+    strip_after_prefix: bool
+    intents_payload: int | None
+    shutdown_timeout: float
+    http_timeout: float
+    image_max_dimension: int
+    image_format: str
+    image_quality: int
+    image_workers: int | None
+    tracing_sample_rate: float
+    tracing_slow_ms: int
+    tracing_buffer_size: int
+    tracing_export_path: str | None
+    tracing_collector_url: str | None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConfigSnapshot":
+        """
+        Creates a snapshot from the contents of the configuration file.
+
+        :param data: Dictionary loaded from the configuration file.
+        :return: New `ConfigSnapshot` instance.
+        :raises ValueError: If any setting has an invalid type or value.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Config: The file must contain a JSON object, not {type(data).__name__}")
+        mentions = _check("allowed_mentions", data.get("allowed_mentions", {}), (dict,))
+        image = _check("image", data.get("image", {}), (dict,))
+        tracing = _check("tracing", data.get("tracing", {}), (dict,))
+        sample_rate = _check("tracing.sample_rate", tracing.get("sample_rate", 0.1), (int, float))
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Config: `tracing.sample_rate` must be 0-1: {sample_rate!r}")
+        owner_ids = _check("owner_ids", data.get("owner_ids", None), (list,), True)
+        prefix = _check("command_prefix", data.get("command_prefix", ";"), (str, list))
+        status = _check("status", data.get("status", None), (str,), True)
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Config: `status` must be one of {STATUSES}: {status!r}")
+        image_quality = _check("image.quality", image.get("quality", 80), (int,))
+        if not 1 <= image_quality <= 100:
+            raise ValueError(f"Config: `image.quality` must be 1-100: {image_quality!r}")
+        image_format = _check("image.format", image.get("format", "webp"), (str,))
+        if not is_supported_format(image_format):
+            raise ValueError(
+                f"Config: `image.format` must be one of {INLINE_FORMATS} supported by Pillow: {image_format!r}"
+            )
+        # fmt: off
+        return cls(
+            mention_everyone=_check("allowed_mentions.everyone", mentions.get("everyone", True), (bool,)),
+            mention_replied_user=_check("allowed_mentions.replied_user", mentions.get("replied_user", True), (bool,)),
+            mention_users=_check("allowed_mentions.users", mentions.get("users", True), (bool,)),
+            mention_roles=_check("allowed_mentions.roles", mentions.get("roles", True), (bool,)),
+            case_insensitive=_check("case_insensitive", data.get("case_insensitive", True), (bool,)),
+            owner_id=_check("owner_id", data.get("owner_id", None), (int,), True),
+            owner_ids=tuple(_check("owner_ids", i, (int,)) for i in owner_ids) if owner_ids else None,
+            prefix=prefix if isinstance(prefix, str) else tuple(_check("command_prefix", p, (str,)) for p in prefix),
+            status=status,
+            strip_after_prefix=bool(_check("strip_after_prefix", data.get("strip_after_prefix", False), (bool,), True)),
+            intents_payload=_check_min("intents_payload", _check("intents_payload", data.get("intents_payload", None), (int,), True), 0),
+            shutdown_timeout=_check_min("shutdown_timeout", _check("shutdown_timeout", data.get("shutdown_timeout", 10), (int, float)), 0),
+            http_timeout=_check_min("http_timeout", _check("http_timeout", data.get("http_timeout", 30), (int, float)), 1),
+            image_max_dimension=_check_min("image.max_dimension", _check("image.max_dimension", image.get("max_dimension", 1024), (int,)), 1),
+            image_format=image_format,
+            image_quality=image_quality,
+            image_workers=_check_min("image.workers", _check("image.workers", image.get("workers", None), (int,), True), 1),
+            tracing_sample_rate=sample_rate,
+            tracing_slow_ms=_check_min("tracing.slow_ms", _check("tracing.slow_ms", tracing.get("slow_ms", 1000), (int,)), 0),
+            tracing_buffer_size=_check_min("tracing.buffer_size", _check("tracing.buffer_size", tracing.get("buffer_size", 50), (int,)), 0),
+            tracing_export_path=_check("tracing.export_path", tracing.get("export_path", None), (str,), True),
+            tracing_collector_url=_check("tracing.collector_url", tracing.get("collector_url", None), (str,), True),
+        )
+        # fmt: on
+
+    @property
+    def allowed_mentions(self) -> discord.AllowedMentions:
+        return discord.AllowedMentions(
+            everyone=self.mention_everyone,
+            replied_user=self.mention_replied_user,
+            users=self.mention_users,
+            roles=self.mention_roles,
+        )
+
+    def diff(self, other: "ConfigSnapshot") -> dict[str, tuple]:
+        """
+        :param other: Snapshot to compare with.
+        :return: Dictionary of changed settings mapped to (old value, new value).
+        """
+        return {
+            field.name: (getattr(self, field.name), getattr(other, field.name))
+            for field in fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        }
+
 
 class Config:
     def __init__(
         self,
         env_path: Path = Path(".env"),
         config_path: Path = Path("utils/config.json"),
+        logs_path: Path = Path("logs/bot.log"),
         is_debug=True,
     ):
-        load_dotenv(env_path)
-        self.token: str = os.getenv("DISCORD_TOKEN")
+        # values are read per file, so that several profiles can be loaded in one process,
+        # environment variables take precedence over the file, as with `load_dotenv`
+        env = {**dotenv_values(env_path), **os.environ}
+        self.name: str = env_path.name
+        self.token: str = env.get("DISCORD_TOKEN")
         if not self.token:
-            logger.critical("DISCORD_TOKEN not found, check .env file")
-            raise ValueError("Brak ustawionego DISCORD_TOKEN w pliku .env")
-        self.psql_host: str = os.getenv("PSQL_HOST")
-        self.psql_port: int = int(os.getenv("PSQL_PORT"))
-        self.psql_db_name: str = os.getenv("PSQL_DB_NAME")
-        self.psql_schema: str = os.getenv("PSQL_SCHEMA")
-        self.psql_user: str = os.getenv("PSQL_USER")
-        self.psql_password: str = os.getenv("PSQL_PASSWORD")
+            logger.critical(f"DISCORD_TOKEN not found, check {env_path} file")
+            raise ValueError(f"Brak ustawionego DISCORD_TOKEN w pliku {env_path}")
+        self.psql_host: str = env.get("PSQL_HOST")
+        self.psql_port: int = int(env.get("PSQL_PORT"))
+        self.psql_db_name: str = env.get("PSQL_DB_NAME")
+        self.psql_schema: str = env.get("PSQL_SCHEMA")
+        self.psql_user: str = env.get("PSQL_USER")
+        self.psql_password: str = env.get("PSQL_PASSWORD")
         self.start_timestamp: float = time.time()
         self.debug: bool = is_debug
+        self.logs_dir: Path = logs_path.parent
         self.slash_commands_count: int = 0
         self.cogs_count: int = 0
         # loading config .js file
-        self.config_file: dict = load_config_file(config_path.__str__()) or {}
-        self.allowed_mentions = discord.AllowedMentions(
-            everyone=self.config_file.get("allowed_mentions", {}).get("everyone", True),
-            replied_user=self.config_file.get("allowed_mentions", {}).get(
-                "replied_user", True
-            ),
-            users=self.config_file.get("allowed_mentions", {}).get("users", True),
-            roles=self.config_file.get("allowed_mentions", {}).get("roles", True),
+        self.config_path: Path = config_path
+        self.config_mtime: float = self._mtime()
+        self.snapshot: ConfigSnapshot = ConfigSnapshot.from_dict(
+            load_config_file(config_path.__str__()) or {}
         )
-        self.case_insensitive = self.config_file.get("case_insensitive", True)
-        self.owner_id = self.config_file.get("owner_id", None)
-        self.owner_ids = self.config_file.get("owner_ids", None)
-        self.prefix = self.config_file.get("command_prefix", ";")
-        self.status = self.config_file.get("status", None)
-        self.strip_after_prefix = self.config_file.get("strip_after_prefix", None)
-        self.intents_payload = self.config_file.get("intents_payload", None)
+
+    def __getattr__(self, name: str):
+        """Settings from the configuration file are read from the current snapshot."""
+        if name == "snapshot":
+            raise AttributeError(name)
+        return getattr(self.snapshot, name)
+
+    def _mtime(self) -> float:
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def file_changed(self) -> bool:
+        """Checks whether the configuration file was modified since it was last loaded."""
+        return self._mtime() != self.config_mtime
+
+    def reload(self) -> dict[str, tuple] | None:
+        """
+        Loads a new snapshot from the configuration file and swaps it in.
+
+        :return: Dictionary of changed settings mapped to (old value, new value),
+        or None if the file could not be loaded or is invalid (the current snapshot is kept).
+        """
+        self.config_mtime = self._mtime()
+        data = load_config_file(self.config_path.__str__())
+        if data is None:
+            logger.error(f"Config: {self.config_path} is unreadable, keeping current settings")
+            return None
+        try:
+            snapshot = ConfigSnapshot.from_dict(data)
+        except ValueError as err:
+            logger.error(f"{err}, keeping current settings")
+            return None
+        changes = self.snapshot.diff(snapshot)
+        self.snapshot = snapshot
+        return changes
@@ -10,7 +10,9 @@ Description:
     offering methods for executing queries and retrieving results.
 """
 
+import asyncio
 import asyncpg
+from core.tracing import span
 from utils.logger import logger
 
 
@@ -18,7 +20,14 @@ class Database:
     """Class handling connection to Postgresql database."""
 
     def __init__(
-        self, host: str, port: int, database: str, schema: str, user: str, password: str
+        self,
+        host: str,
+        port: int,
+        database: str,
+        schema: str,
+        user: str,
+        password: str,
+        parent: "Database | None" = None,
     ):
         self.host = host
         self.port = port
@@ -26,29 +35,65 @@ class Database:
         self.schema = schema
         self.user = user
         self.password = password
+        self.parent = parent
         self.pool: asyncpg.Pool | None = None
+        self.queries: int = 0
+        self._users: int = 0
+        self._lock = asyncio.Lock()
+
+    def for_schema(self, schema: str) -> "Database":
+        """
+        Creates a database handle that shares this instance's pool,
+        but runs its queries in the given schema.
+
+        :param schema: Schema set as `search_path` for every query.
+        :return: New `Database` instance using the shared pool.
+        """
+        return Database(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            schema=schema,
+            user=self.user,
+            password=self.password,
+            parent=self,
+        )
 
     async def connect(self):
-        if self.pool is None:
-            self.pool = await asyncpg.create_pool(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                command_timeout=60,
-                init=self._init_connection
-            )
-            logger.info(f"Postgresql: Connected to {self.host}:{self.port}")
+        if self.parent is not None:
+            await self.parent.connect()
+            self.pool = self.parent.pool
+            return
+        async with self._lock:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    host=self.host,
+                    port=self.port,
+                    database=self.database,
+                    user=self.user,
+                    password=self.password,
+                    command_timeout=60,
+                    init=self._init_connection
+                )
+                logger.info(f"Postgresql: Connected to {self.host}:{self.port}")
+            # counted only once connected, a failed connect holds no reference
+            self._users += 1
 
     async def _init_connection(self, conn):
         await conn.execute(f"SET search_path TO {self.schema}")
 
     async def disconnect(self):
-        if self.pool:
-            await self.pool.close()
+        """Closes the pool once every instance sharing it has disconnected."""
+        if self.parent is not None:
             self.pool = None
-            logger.critical(f"Postgresql: Disconnected from {self.host}:{self.port}")
+            await self.parent.disconnect()
+            return
+        async with self._lock:
+            self._users = max(0, self._users - 1)
+            if self.pool and not self._users:
+                await self.pool.close()
+                self.pool = None
+                logger.critical(f"Postgresql: Disconnected from {self.host}:{self.port}")
 
     async def execute(self, query: str, *args) -> str | None:
         """
@@ -62,9 +107,11 @@ class Database:
         if not self.pool:
             logger.warning(f"Postgresql: Not connected to {self.host}:{self.port}")
             return None
-        async with self.pool.acquire() as conn:
-            await conn.execute(f"SET search_path TO {self.schema}")
-            return await conn.execute(query, *args)
+        self.queries += 1
+        with span("postgresql", query=query):
+            async with self.pool.acquire() as conn:
+                await conn.execute(f"SET search_path TO {self.schema}")
+                return await conn.execute(query, *args)
 
     async def fetch(self, query: str, *args) -> list[asyncpg.Record] | None:
         """
@@ -78,9 +125,11 @@ class Database:
         if not self.pool:
             logger.warning(f"Postgresql: Not connected to {self.host}:{self.port}")
             return None
-        async with self.pool.acquire() as conn:
-            await conn.execute(f"SET search_path TO {self.schema}")
-            return await conn.fetch(query, *args)
+        self.queries += 1
+        with span("postgresql", query=query):
+            async with self.pool.acquire() as conn:
+                await conn.execute(f"SET search_path TO {self.schema}")
+                return await conn.fetch(query, *args)
 
     async def fetchrow(self, query: str, *args) -> asyncpg.Record | None:
         """
@@ -94,9 +143,11 @@ class Database:
         if not self.pool:
             logger.warning(f"Postgresql: Not connected to {self.host}:{self.port}")
             return None
-        async with self.pool.acquire() as conn:
-            await conn.execute(f"SET search_path TO {self.schema}")
-            return await conn.fetchrow(query, *args)
+        self.queries += 1
+        with span("postgresql", query=query):
+            async with self.pool.acquire() as conn:
+                await conn.execute(f"SET search_path TO {self.schema}")
+                return await conn.fetchrow(query, *args)
 
     async def fetchval(self, query: str, *args):
         """
@@ -110,6 +161,8 @@ class Database:
         if not self.pool:
             logger.warning(f"Postgresql: Not connected to {self.host}:{self.port}")
             return None
-        async with self.pool.acquire() as conn:
-            await conn.execute(f"SET search_path TO {self.schema}")
-            return await conn.fetchval(query, *args)
+        self.queries += 1
+        with span("postgresql", query=query):
+            async with self.pool.acquire() as conn:
+                await conn.execute(f"SET search_path TO {self.schema}")
+                return await conn.fetchval(query, *args)
@@ -9,17 +9,96 @@ Description:
     The main module of the Discord bot, responsible for initializing the connection to the database and automatically loading and synchronizing modules (cogs).
 """
 
+import asyncio
+import inspect
+import logging
+import time
 from pathlib import Path
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 from discord.ext.commands import CommandNotFound, Context
 from core.database import Database
-from core.config import Config
+from core.images import ImageProcessor
+from core.tracing import Tracer, span
+from core.webclient import WebClient
+from core.config import Config, RESTART_REQUIRED
 from utils.logger import logger
 
+try:
+    from discord.webhook.async_ import AsyncWebhookAdapter
+except ImportError:
+    AsyncWebhookAdapter = None
+
+
+def _trace_webhook_requests():
+    """
+    Records every webhook request as a span of the current trace.
+    Interaction responses and followups are sent through the webhook adapter,
+    not through the bot's HTTP client. The adapter is shared by the whole process,
+    so it is wrapped only once.
+
+    `AsyncWebhookAdapter.request(self, route, session, ...)` is private API of
+    discord.py, checked against the version pinned in requirements.txt (2.5.0).
+    If it is missing or its signature changed, interaction responses are simply
+    not traced.
+    """
+    request = getattr(AsyncWebhookAdapter, "request", None)
+    if request is None or not inspect.iscoroutinefunction(request):
+        logger.warning("Tracing: discord.py webhook adapter not found, interaction responses are not traced")
+        return
+    if getattr(request, "traced", False):
+        return
+    if list(inspect.signature(request).parameters)[:3] != ["self", "route", "session"]:
+        logger.warning("Tracing: discord.py webhook adapter changed, interaction responses are not traced")
+        return
+
+    async def traced_request(self, route, *args, **kwargs):
+        method = getattr(route, "method", None)
+        path = getattr(route, "path", None)
+        with span("discord", method=method, path=path):
+            return await request(self, route, *args, **kwargs)
+
+    traced_request.traced = True
+    AsyncWebhookAdapter.request = traced_request
+
+
+class DiscordTree(app_commands.CommandTree):
+    """Command tree that refuses new interactions while the bot is shutting down."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.client.draining:
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "The bot is restarting, try again in a moment.", ephemeral=True
+                )
+            return False
+        self.client.track_in_flight()
+        command = interaction.command
+        self.client.tracer.trace_task(
+            f"/{command.qualified_name}" if command else f"interaction:{interaction.type.name}",
+            interaction_id=interaction.id,
+            guild_id=interaction.guild_id,
+        )
+        return True
+
 
 class DiscordBot(commands.Bot):
-    def __init__(self, config: Config, *args, **kwargs):
+    def __init__(
+        self,
+        config: Config,
+        *args,
+        db: Database | None = None,
+        web: WebClient | None = None,
+        images: ImageProcessor | None = None,
+        **kwargs,
+    ):
+        """
+        :param config: Configuration of this bot instance.
+        :param db: Database whose pool is shared with other bot instances.
+        :param web: HTTP client whose session is shared with other bot instances.
+        :param images: Image processor shared with other bot instances.
+        """
         intents = discord.Intents.default()
         if config.intents_payload is not None:
             intents.value = config.intents_payload
@@ -32,31 +111,204 @@ class DiscordBot(commands.Bot):
             "case_insensitive": config.case_insensitive,
             "strip_after_prefix": config.strip_after_prefix,
             "intents": intents,
+            "tree_cls": DiscordTree,
             **kwargs,
         }
         super().__init__(*args, **bot_kwargs)
 
         self.config = config
-        self.db = Database(
-            host=config.psql_host,
-            port=config.psql_port,
-            database=config.psql_db_name,
-            schema=config.psql_schema,
-            user=config.psql_user,
-            password=config.psql_password,
+        if db is not None:
+            self.db = db.for_schema(config.psql_schema)
+        else:
+            self.db = Database(
+                host=config.psql_host,
+                port=config.psql_port,
+                database=config.psql_db_name,
+                schema=config.psql_schema,
+                user=config.psql_user,
+                password=config.psql_password,
+            )
+        if web is not None:
+            self.web = web.for_tenant()
+        else:
+            self.web = WebClient(timeout=config.http_timeout)
+        if images is not None:
+            self.images = images.for_tenant()
+        else:
+            self.images = ImageProcessor(
+                max_dimension=config.image_max_dimension,
+                image_format=config.image_format,
+                quality=config.image_quality,
+                workers=config.image_workers,
+            )
+        self.tracer = Tracer(
+            sample_rate=config.tracing_sample_rate,
+            slow_threshold=config.tracing_slow_ms / 1000,
+            buffer_size=config.tracing_buffer_size,
+            export_path=config.tracing_export_path,
+            collector_url=config.tracing_collector_url,
+            web=self.web,
         )
+        self._trace_http_requests()
+        self.draining: bool = False
+        self.in_flight: set[asyncio.Task] = set()
+        self._shutdown_task: asyncio.Task | None = None
+        # shared resources acquired by this bot, only these are released on shutdown
+        self._db_connected: bool = False
+        self._web_connected: bool = False
+        self._images_started: bool = False
 
-    def __del__(self):
-        logger.warning(f"Bot {self.user} is offline.")
+    def _trace_http_requests(self):
+        """Records every request to the Discord API, including interaction responses, as a span of the current trace."""
+        request = self.http.request
+
+        async def traced_request(route, **kwargs):
+            with span("discord", method=route.method, path=route.path):
+                return await request(route, **kwargs)
+
+        self.http.request = traced_request
+        _trace_webhook_requests()
 
     async def setup_hook(self):
         """
         Hook called when the bot starts up,
         initializing the connection to the database,
-        clearing the module table, and loading extensions.
+        opening the HTTP session, starting the image process pool, clearing the module table, and loading extensions.
         """
         await self.db.connect()
+        self._db_connected = True
+        await self.web.connect()
+        self._web_connected = True
+        self.images.start()
+        self._images_started = True
         await self.load_extensions()
+        self.watch_config.start()
+
+    async def reload_config(self) -> tuple[dict[str, tuple], list[str]] | None:
+        """
+        Loads a new configuration snapshot and applies the changed settings live.
+        Settings that are only read on startup are left as they are and reported.
+
+        :return: Tuple of the changed settings mapped to (old value, new value)
+        and the names of changed settings that require a restart,
+        or None if the new configuration was rejected.
+        """
+        changes = self.config.reload()
+        if changes is None:
+            return None
+        snapshot = self.config.snapshot
+        if "prefix" in changes:
+            self.command_prefix = snapshot.prefix
+        if "strip_after_prefix" in changes:
+            self.strip_after_prefix = snapshot.strip_after_prefix
+        if any(name.startswith("mention_") for name in changes):
+            self.allowed_mentions = snapshot.allowed_mentions
+        if "owner_id" in changes or "owner_ids" in changes:
+            self.owner_ids = snapshot.owner_ids or None
+            self.owner_id = None if snapshot.owner_ids else snapshot.owner_id
+        if "status" in changes:
+            status = discord.Status(snapshot.status) if snapshot.status else None
+            await self.change_presence(status=status)
+        self.tracer.sample_rate = snapshot.tracing_sample_rate
+        self.tracer.slow_threshold = snapshot.tracing_slow_ms / 1000
+        self.tracer.export_path = snapshot.tracing_export_path
+        self.tracer.collector_url = snapshot.tracing_collector_url
+        if "tracing_buffer_size" in changes:
+            self.tracer.resize(snapshot.tracing_buffer_size)
+
+        restart = [name for name in changes if name in RESTART_REQUIRED]
+        logger.info(f"Config: Reloaded, changed: {', '.join(changes) or 'nothing'}")
+        if restart:
+            logger.warning(f"Config: Restart required to apply: {', '.join(restart)}")
+        return changes, restart
+
+    @tasks.loop(seconds=5)
+    async def watch_config(self):
+        """Reloads the configuration when its file is modified."""
+        if self.config.file_changed():
+            # a failed reload must not stop the loop, the next change is picked up again
+            try:
+                await self.reload_config()
+            except Exception as err:
+                logger.error(f"Config: Failed to apply reloaded settings: {err}", exc_info=True)
+
+    @watch_config.before_loop
+    async def before_watch_config(self):
+        await self.wait_until_ready()
+
+    def track_in_flight(self):
+        """Registers the current task as an in-flight command handler, awaited on shutdown."""
+        task = asyncio.current_task()
+        if task is not None:
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    async def process_commands(self, message: discord.Message):
+        """Ignores prefix commands during shutdown, otherwise tracks, traces and processes them."""
+        if self.draining or message.author.bot:
+            return
+        ctx = await self.get_context(message)
+        if ctx.command is not None:
+            self.track_in_flight()
+            self.tracer.trace_task(
+                f"{ctx.prefix}{ctx.command.qualified_name}",
+                message_id=message.id,
+                guild_id=message.guild.id if message.guild else None,
+            )
+        await self.invoke(ctx)
+
+    async def close(self):
+        """
+        Shuts the bot down gracefully: stops accepting new commands,
+        waits up to `shutdown_timeout` seconds for in-flight handlers,
+        then stops the image process pool, the connection to Discord,
+        the HTTP session and the database pool, in that order.
+        """
+        self.in_flight.discard(asyncio.current_task())
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self._shutdown())
+        await self._shutdown_task
+
+    async def _shutdown(self):
+        self.draining = True
+        start = time.perf_counter()
+        pending = len(self.in_flight)
+        logger.warning(f"Shutdown ({self.config.name}): Draining {pending} in-flight handlers...")
+        if self.in_flight:
+            _, not_done = await asyncio.wait(
+                set(self.in_flight), timeout=self.config.shutdown_timeout
+            )
+            for task in not_done:
+                task.cancel()
+            # let the cancelled handlers run their cleanup before the pools are closed
+            if not_done:
+                await asyncio.wait(not_done, timeout=1)
+        else:
+            not_done = set()
+        drain_time = time.perf_counter() - start
+        logger.warning(
+            f"Shutdown ({self.config.name}): Drained {pending - len(not_done)}/{pending} handlers "
+            f"in {drain_time:.2f}s ({len(not_done)} cancelled)"
+        )
+
+        self.watch_config.cancel()
+        if self._images_started:
+            self._images_started = False
+            self.images.shutdown()
+        await self.tracer.flush()
+        await super().close()
+        if self._web_connected:
+            self._web_connected = False
+            await self.web.disconnect()
+        if self._db_connected:
+            self._db_connected = False
+            await self.db.disconnect()
+        logger.warning(
+            f"Bot {self.user} is offline. "
+            f"Shutdown took {time.perf_counter() - start:.2f}s"
+        )
+        for handler in logging.getLogger().handlers + logger.handlers:
+            handler.flush()
 
     async def on_ready(self):
         """Method called when the bot is ready to run (after fully loading)."""
@@ -0,0 +1,179 @@
+"""
+File: images.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    A class that downscales and re-encodes images in a process pool,
+    so that image processing never blocks the event loop.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, UnidentifiedImageError
+from utils.logger import logger
+
+# Formats which Discord displays inline, other formats are uploaded as plain files.
+INLINE_FORMATS = ("webp", "jpeg", "png", "gif")
+
+
+def is_supported_format(image_format: str) -> bool:
+    """Checks whether the format is displayed inline by Discord and Pillow can save it."""
+    Image.init()
+    return image_format.lower() in INLINE_FORMATS and image_format.upper() in Image.SAVE
+
+
+def _extension(image_format: str) -> str:
+    image_format = image_format.lower()
+    return "jpg" if image_format == "jpeg" else image_format
+
+
+def process_image(
+    data: bytes, max_dimension: int, image_format: str, quality: int
+) -> tuple[bytes, str]:
+    """
+    Downscales the image to `max_dimension` and re-encodes it in `image_format`.
+    Runs inside a worker process.
+
+    :param data: Raw image bytes.
+    :param max_dimension: Maximum width and height of the result in pixels.
+    :param image_format: Pillow format name of the result, e.g. `webp`.
+    :param quality: Encoder quality (1-100).
+    :return: Tuple of the resulting bytes and the file extension. The original
+    bytes are returned if they are animated or smaller than the re-encoded image.
+    """
+    output = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as image:
+        original_ext = _extension(image.format or "png")
+        if getattr(image, "is_animated", False):
+            return data, original_ext
+        image.thumbnail((max_dimension, max_dimension))
+        if image_format.lower() == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output, format=image_format, quality=quality)
+
+    if output.tell() >= len(data):
+        return data, original_ext
+    return output.getvalue(), _extension(image_format)
+
+
+class ImageProcessor:
+    """Class handling the process pool used for image processing."""
+
+    def __init__(
+        self,
+        max_dimension: int = 1024,
+        image_format: str = "webp",
+        quality: int = 80,
+        workers: int | None = None,
+        parent: "ImageProcessor | None" = None,
+    ):
+        self.parent = parent
+        self.max_dimension = max_dimension
+        self.image_format = image_format
+        self.quality = quality
+        self.workers = workers
+        self.pool: ProcessPoolExecutor | None = None
+        self.processed_count: int = 0
+        self.bytes_saved: int = 0
+        self.processing_time: float = 0.0
+        self._users: int = 0
+
+    def for_tenant(self) -> "ImageProcessor":
+        """
+        Creates a processor that shares this instance's process pool,
+        but counts its own processed images.
+
+        :return: New `ImageProcessor` instance using the shared pool.
+        """
+        return ImageProcessor(
+            max_dimension=self.max_dimension,
+            image_format=self.image_format,
+            quality=self.quality,
+            workers=self.workers,
+            parent=self,
+        )
+
+    def start(self):
+        if self.parent is not None:
+            self.parent.start()
+            self.pool = self.parent.pool
+            return
+        self._users += 1
+        if self.pool is None:
+            # workers must not be forked from a process with a running loop and open sockets
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+            )
+            logger.info("Images: Process pool started")
+
+    def shutdown(self):
+        """Stops the pool once every bot sharing it has shut down."""
+        if self.parent is not None:
+            self.pool = None
+            self.parent.shutdown()
+            return
+        self._users = max(0, self._users - 1)
+        if self.pool and not self._users:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            logger.warning("Images: Process pool stopped")
+
+    async def process(
+        self,
+        data: bytes,
+        max_dimension: int | None = None,
+        image_format: str | None = None,
+        quality: int | None = None,
+        fallback_ext: str = "png",
+    ) -> tuple[bytes, str]:
+        """
+        Processes the image in the process pool.
+        Settings not given are taken from the processor, bots sharing it pass their own.
+
+        :param data: Raw image bytes.
+        :param max_dimension: Maximum width and height of the result in pixels.
+        :param image_format: Pillow format name of the result.
+        :param quality: Encoder quality (1-100).
+        :param fallback_ext: Extension returned with unprocessed bytes.
+        :return: Tuple of the processed bytes and the file extension,
+        or the original bytes if the pool is not running or processing failed.
+        """
+        if not self.pool:
+            logger.warning("Images: Process pool is not running")
+            return data, fallback_ext
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result, ext = await loop.run_in_executor(
+                self.pool,
+                process_image,
+                data,
+                max_dimension or self.max_dimension,
+                image_format or self.image_format,
+                quality or self.quality,
+            )
+        except UnidentifiedImageError:
+            logger.warning(f"Images: Unrecognized image format ({len(data)} bytes)")
+            return data, fallback_ext
+        except Exception as err:
+            logger.error(f"Images: Failed to process image: {err}", exc_info=True)
+            return data, fallback_ext
+
+        elapsed = time.perf_counter() - start
+        saved = len(data) - len(result)
+        self.processed_count += 1
+        self.bytes_saved += saved
+        self.processing_time += elapsed
+        logger.info(
+            f"Images: {len(data)} -> {len(result)} bytes "
+            f"(saved {saved}) in {elapsed * 1000:.1f} ms"
+        )
+        return result, ext
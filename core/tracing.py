@@ -0,0 +1,217 @@
+"""
+File: tracing.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    Lightweight tracing of command handlers, with child spans for database
+    and HTTP calls, sampling, a buffer of recent slow traces and optional export.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import time
+from collections import deque
+from utils.logger import logger
+
+# Span of the trace recorded in the current task, None if the task is not sampled.
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class _NoopSpan:
+    """Returned for unsampled tasks, so that tracing costs only a context variable lookup."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "attributes",
+        "parent",
+        "root",
+        "start",
+        "duration",
+        "spans",
+        "trace_id",
+        "_token",
+    )
+
+    def __init__(self, name: str, attributes: dict, parent: "Span | None" = None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.root: Span = parent.root if parent else self
+        self.start: float = time.perf_counter()
+        self.duration: float | None = None
+        # all spans of the trace are collected on the root span
+        self.spans: list[Span] = [] if parent is None else self.root.spans
+        self.trace_id: str = os.urandom(8).hex() if parent is None else self.root.trace_id
+        self._token: contextvars.Token | None = None
+        self.spans.append(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current.reset(self._token)
+        return False
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "spans": [
+                {
+                    "name": child.name,
+                    "parent": child.parent.name if child.parent else None,
+                    "offset_ms": round((child.start - self.start) * 1000, 3),
+                    "duration_ms": round((child.duration or 0) * 1000, 3),
+                    "attributes": child.attributes,
+                }
+                for child in self.spans[1:]
+            ],
+            "attributes": self.attributes,
+        }
+
+
+def span(name: str, **attributes) -> Span | _NoopSpan:
+    """
+    Opens a child span of the current trace.
+
+    :param name: Name of the span, e.g. `postgresql`.
+    :param attributes: Additional attributes recorded with the span.
+    :return: Context manager of the span, a no-op if the current task is not sampled.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, attributes, parent)
+
+
+class Tracer:
+    """Class deciding which tasks are traced, and keeping and exporting finished traces."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.1,
+        slow_threshold: float = 1.0,
+        buffer_size: int = 50,
+        export_path: str | None = None,
+        collector_url: str | None = None,
+        web=None,
+    ):
+        """
+        :param sample_rate: Fraction of tasks that are traced (0-1).
+        :param slow_threshold: Duration in seconds from which a trace is kept in the buffer.
+        :param buffer_size: Number of recent slow traces kept.
+        :param export_path: File to which every finished trace is appended as JSON line.
+        :param collector_url: URL to which every finished trace is sent as JSON.
+        :param web: `WebClient` used to send traces to the collector.
+        """
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.export_path = export_path
+        self.collector_url = collector_url
+        self.web = web
+        self.slow_traces: deque[Span] = deque(maxlen=buffer_size)
+        self.traced: int = 0
+        # exports still being written or sent, awaited by `flush()`
+        self._pending: set[asyncio.Future] = set()
+
+    def resize(self, buffer_size: int):
+        """Changes the number of slow traces kept, keeping the most recent ones."""
+        self.slow_traces = deque(self.slow_traces, maxlen=buffer_size)
+
+    def trace_task(self, name: str, **attributes) -> Span | None:
+        """
+        Starts a trace covering the rest of the current task, if it is sampled.
+
+        :param name: Name of the trace, e.g. the command name.
+        :param attributes: Additional attributes recorded with the trace.
+        :return: The root span, or None if the task is not sampled.
+        """
+        task = asyncio.current_task()
+        if task is None or random.random() >= self.sample_rate:
+            return None
+        root = Span(name, attributes)
+        _current.set(root)
+        task.add_done_callback(lambda _: self._finish(root))
+        return root
+
+    def _finish(self, root: Span):
+        root.finish()
+        self.traced += 1
+        if root.duration >= self.slow_threshold:
+            self.slow_traces.append(root)
+            logger.debug(f"Tracing: Slow trace {root.name} took {root.duration * 1000:.0f} ms")
+        if self.export_path or self.collector_url:
+            data = root.to_dict()
+            loop = asyncio.get_running_loop()
+            if self.export_path:
+                self._keep(loop.run_in_executor(None, self._write, self.export_path, data))
+            if self.collector_url and self.web and self.web.session:
+                # empty context, so that the export is not recorded as a span of this trace
+                self._keep(loop.create_task(self._send(data), context=contextvars.Context()))
+
+    def _keep(self, future: asyncio.Future):
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    async def flush(self, timeout: float = 5):
+        """
+        Waits for pending exports, called on shutdown before the HTTP session is closed.
+
+        :param timeout: Maximum time to wait in seconds.
+        """
+        if self._pending:
+            _, not_done = await asyncio.wait(set(self._pending), timeout=timeout)
+            if not_done:
+                logger.warning(f"Tracing: {len(not_done)} trace exports did not finish")
+
+    @staticmethod
+    def _write(path: str, data: dict):
+        try:
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(data, default=str) + "\n")
+        except OSError as err:
+            logger.error(f"Tracing: Failed to export trace to {path}: {err}")
+
+    async def _send(self, data: dict):
+        try:
+            async with self.web.session.post(self.collector_url, json=data) as resp:
+                if resp.status >= 400:
+                    logger.warning(f"Tracing: Collector responded with {resp.status}")
+        except Exception as err:
+            logger.warning(f"Tracing: Failed to send trace to {self.collector_url}: {err}")
@@ -0,0 +1,86 @@
+"""
+File: webclient.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    A class that holds the aiohttp session used for outbound HTTP requests,
+    so that it can be shared between commands and bot instances.
+"""
+
+import asyncio
+import aiohttp
+from core.tracing import span
+from utils.logger import logger
+
+
+class WebClient:
+    """Class handling the shared aiohttp session."""
+
+    def __init__(self, timeout: float = 30, parent: "WebClient | None" = None):
+        self.timeout = timeout
+        self.parent = parent
+        self.session: aiohttp.ClientSession | None = None
+        self.requests: int = 0
+        self.bytes_received: int = 0
+        self._users: int = 0
+        self._lock = asyncio.Lock()
+
+    def for_tenant(self) -> "WebClient":
+        """
+        Creates a client that shares this instance's session,
+        but counts its own requests.
+
+        :return: New `WebClient` instance using the shared session.
+        """
+        return WebClient(timeout=self.timeout, parent=self)
+
+    async def connect(self):
+        if self.parent is not None:
+            await self.parent.connect()
+            self.session = self.parent.session
+            return
+        async with self._lock:
+            if self.session is None:
+                self.session = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                )
+                logger.info("HTTP: Session opened")
+            # counted only once opened, a failed open holds no reference
+            self._users += 1
+
+    async def disconnect(self):
+        """Closes the session once every instance sharing it has disconnected."""
+        if self.parent is not None:
+            self.session = None
+            await self.parent.disconnect()
+            return
+        async with self._lock:
+            self._users = max(0, self._users - 1)
+            if self.session and not self._users:
+                await self.session.close()
+                self.session = None
+                logger.warning("HTTP: Session closed")
+
+    async def read(self, url: str) -> tuple[int, bytes | None]:
+        """
+        Sends a GET request and reads the whole response body.
+
+        :param url: Requested URL.
+        :return: Tuple of the response status and body,
+        the body is None if the status is not 200.
+        """
+        if not self.session:
+            logger.warning("HTTP: Session is not open")
+            return 503, None
+        self.requests += 1
+        with span("http", method="GET", url=url) as current:
+            async with self.session.get(url) as resp:
+                current.set_attribute("status", resp.status)
+                if resp.status != 200:
+                    return resp.status, None
+                data = await resp.read()
+        self.bytes_received += len(data)
+        return resp.status, data
@@ -13,35 +13,107 @@ Description:
     At the beginning, start with the --help flag.
 """
 
+import asyncio
+import signal
 from core.discordbot import DiscordBot
 from core.config import Config
+from core.database import Database
+from core.images import ImageProcessor
+from core.webclient import WebClient
 from utils.logger import set_logger, logger
 from utils.tools import parse_args
+from utils import speedups
 from pathlib import Path
 
 
+async def run_bots(configs: list[Config]):
+    """
+    Runs a bot for every configuration on the current event loop.
+    Bots connecting to the same Postgresql database share one pool,
+    and all bots share the HTTP session and the image process pool.
+    """
+    databases: dict[tuple, Database] = {}
+    web = WebClient(timeout=configs[0].http_timeout)
+    images = ImageProcessor(
+        max_dimension=configs[0].image_max_dimension,
+        image_format=configs[0].image_format,
+        quality=configs[0].image_quality,
+        workers=configs[0].image_workers,
+    )
+    if any(config.image_workers != configs[0].image_workers for config in configs):
+        logger.warning(f"Images: The process pool is shared, using `image.workers` of {configs[0].name}")
+    if any(config.http_timeout != configs[0].http_timeout for config in configs):
+        logger.warning(f"HTTP: The session is shared, using `http_timeout` of {configs[0].name}")
+    bots = []
+    for config in configs:
+        key = (config.psql_host, config.psql_port, config.psql_db_name, config.psql_user)
+        if key not in databases:
+            databases[key] = Database(
+                host=config.psql_host,
+                port=config.psql_port,
+                database=config.psql_db_name,
+                schema=config.psql_schema,
+                user=config.psql_user,
+                password=config.psql_password,
+            )
+        bots.append(DiscordBot(config=config, db=databases[key], web=web, images=images))
+
+    loop = asyncio.get_running_loop()
+    close_tasks: set[asyncio.Task] = set()
+
+    def close_bots():
+        for bot in bots:
+            task = loop.create_task(bot.close())
+            close_tasks.add(task)
+            task.add_done_callback(close_tasks.discard)
+
+    try:
+        loop.add_signal_handler(signal.SIGTERM, close_bots)
+    except NotImplementedError:
+        logger.warning("SIGTERM handler is not supported on this platform.")
+
+    async def run_bot(bot: DiscordBot):
+        # a failing bot (e.g. invalid token) must not stop the other bots
+        try:
+            async with bot:
+                await bot.start(bot.config.token)
+        except Exception as err:
+            logger.critical(f"Bot {bot.config.name} stopped with an error: {err}", exc_info=True)
+
+    await asyncio.gather(*(run_bot(bot) for bot in bots), return_exceptions=True)
+
+
 def main():
     args = parse_args()
-    config_path = Path(args.config)
-    env_path = Path(args.env)
     log_path = Path(args.logs_path)
 
     set_logger(log_path, args.debug, args.stream)
     logger.info(f"Logs path: {log_path} - debug: {args.debug} - stream: {args.stream}")
+    if args.fast:
+        speedups.enable()
 
-    if not env_path.exists():
-        logger.critical(f"Environment file {env_path} not found!")
-        exit(1)
-
-    config = Config(
-        is_debug=args.debug,
-        env_path=env_path,
-        config_path=config_path,
-    )
-    bot = DiscordBot(config=config)
+    configs = []
+    for index, env in enumerate(args.env):
+        env_path = Path(env)
+        config_path = Path(args.config[min(index, len(args.config) - 1)])
+        if not env_path.exists():
+            logger.critical(f"Environment file {env_path} not found!")
+            exit(1)
+        configs.append(
+            Config(
+                is_debug=args.debug,
+                env_path=env_path,
+                config_path=config_path,
+                logs_path=log_path,
+            )
+        )
+    logger.info(f"Starting {len(configs)} bot(s): {', '.join(c.name for c in configs)}")
 
     try:
-        bot.run(config.token)
+        with asyncio.Runner(loop_factory=speedups.loop_factory()) as runner:
+            runner.run(run_bots(configs))
+    except KeyboardInterrupt:
+        pass
     except Exception as err:
         logger.critical(f"Critical error launching the bot: {err}", exc_info=True)
 
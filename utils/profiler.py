@@ -0,0 +1,159 @@
+"""
+File: profiler.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    A lightweight sampling CPU profiler and tracemalloc snapshot helper,
+    which can be started and stopped while the bot is running.
+"""
+
+import signal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from utils.logger import logger
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the main thread (running the event loop) with a `SIGPROF` timer.
+    The timer counts CPU time, so samples land in the code that is actually running,
+    not in the idle `select()` call. The sampling overhead is bounded by the interval,
+    not by the amount of code executed. Memory tracing is opt-in, as tracemalloc
+    slows down every allocation (several times for allocation-heavy code).
+
+    The timer, the signal handler and tracemalloc are process-wide,
+    so only one profiler can run at a time.
+    """
+
+    # profiler currently running in this process
+    _active: "SamplingProfiler | None" = None
+
+    def __init__(self, interval: float = 0.01, trace_memory: bool = False):
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.stacks: Counter = Counter()
+        self.hotspots: Counter = Counter()
+        self.samples: int = 0
+        self.started_at: float = 0.0
+        self.duration: float = 0.0
+        self.running: bool = False
+        self._previous_handler = None
+        self._started_tracemalloc: bool = False
+        self._start_snapshot: tracemalloc.Snapshot | None = None
+        self._stop_snapshot: tracemalloc.Snapshot | None = None
+        self._memory_diff: list[tracemalloc.StatisticDiff] = []
+
+    def start(self):
+        """
+        Starts sampling, must be called from the main thread.
+
+        :raises RuntimeError: If the platform has no `SIGPROF` timer, not called from
+        the main thread, or another profiler is already running in this process.
+        """
+        if self.running:
+            return
+        if SamplingProfiler._active is not None:
+            raise RuntimeError("Another profiler is already running in this process")
+        if not hasattr(signal, "setitimer"):
+            raise RuntimeError("The sampling profiler requires signal.setitimer (Unix only)")
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("The sampling profiler must be started from the main thread")
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(1)
+                self._started_tracemalloc = True
+            self._start_snapshot = tracemalloc.take_snapshot()
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        # restart system calls interrupted by the timer instead of failing with EINTR
+        signal.siginterrupt(signal.SIGPROF, False)
+        self.started_at = time.perf_counter()
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.running = True
+        SamplingProfiler._active = self
+        logger.info(f"Profiler: Started (interval {self.interval * 1000:.0f} ms)")
+
+    def stop(self):
+        """Stops sampling and takes the closing tracemalloc snapshot, must be called from the main thread."""
+        if not self.running:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self.running = False
+        SamplingProfiler._active = None
+        self.duration = time.perf_counter() - self.started_at
+        if self._start_snapshot is not None:
+            self._stop_snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        logger.info(f"Profiler: Stopped after {self.duration:.1f}s, {self.samples} samples")
+
+    def _sample(self, signum, frame):
+        """`SIGPROF` handler, `frame` is the frame interrupted by the timer."""
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        self.hotspots[stack[0]] += 1
+        self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def compare_memory(self):
+        """Computes the allocation differences between the start and stop snapshots (slow, can run in a thread)."""
+        if self._start_snapshot is not None and self._stop_snapshot is not None:
+            self._memory_diff = self._stop_snapshot.compare_to(self._start_snapshot, "lineno")
+            self._start_snapshot = self._stop_snapshot = None
+
+    def top_hotspots(self, limit: int = 10) -> list[tuple[str, float]]:
+        """
+        :param limit: Maximum number of entries.
+        :return: List of (frame, percentage of samples) tuples, most frequent first.
+        """
+        if not self.samples:
+            return []
+        return [
+            (frame, count * 100 / self.samples)
+            for frame, count in self.hotspots.most_common(limit)
+        ]
+
+    def top_allocations(self, limit: int = 10) -> list[tracemalloc.StatisticDiff]:
+        """
+        :param limit: Maximum number of entries.
+        :return: Allocation differences between start and stop, largest first.
+        """
+        self.compare_memory()
+        return self._memory_diff[:limit]
+
+    def dump(self, directory: Path, limit: int = 50) -> tuple[Path, Path | None]:
+        """
+        Writes the collected stacks in the collapsed format (readable by
+        flamegraph.pl and speedscope) and the top allocation diffs.
+
+        :param directory: Directory in which the files will be created.
+        :param limit: Maximum number of allocation diffs to write.
+        :return: Paths of the stacks file and the allocations file (None if memory was not traced).
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        stacks_path = directory / f"profile-{stamp}.collapsed"
+        with open(stacks_path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        memory_path = None
+        if self.trace_memory:
+            memory_path = directory / f"memory-{stamp}.txt"
+            with open(memory_path, "w", encoding="utf-8") as file:
+                for stat in self.top_allocations(limit):
+                    file.write(f"{stat}\n")
+        logger.info(f"Profiler: Data written to {directory}")
+        return stacks_path, memory_path
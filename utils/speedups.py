@@ -0,0 +1,75 @@
+"""
+File: speedups.py
+
+Author: WhiteMonsterZeroUltraEnergy
+Repository: https://github.com/WhiteMonsterZeroUltraEnergy/PeterGriffin
+License: GPL v3
+
+Description:
+    Optional runtime accelerations (uvloop event loop, orjson codec),
+    enabled with the --fast flag and skipped when the packages are not installed.
+"""
+
+import asyncio
+import json
+from typing import Any, Callable
+from utils.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Names of the accelerations enabled by `enable()`.
+active: list[str] = []
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Decodes JSON with orjson if it is enabled, otherwise with the standard library."""
+    if "orjson" in active:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def enable() -> list[str]:
+    """
+    Enables every available acceleration.
+    discord.py decodes gateway payloads with orjson whenever it is installed,
+    with or without this call, see `status()`.
+
+    :return: List of enabled accelerations.
+    """
+    if uvloop is None:
+        logger.info("Speedups: uvloop is not installed, using the default event loop")
+    elif "uvloop" not in active:
+        active.append("uvloop")
+
+    if orjson is None:
+        logger.info("Speedups: orjson is not installed, using the json module")
+    elif "orjson" not in active:
+        active.append("orjson")
+
+    logger.info(f"Speedups: Enabled {', '.join(active) or 'none'}")
+    return active
+
+
+def status() -> list[str]:
+    """:return: Accelerations in effect, including discord.py's own use of orjson for the gateway."""
+    import discord.utils
+
+    result = list(active)
+    if discord.utils.HAS_ORJSON:
+        result.append("orjson (gateway)")
+    return result
+
+
+def loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """:return: uvloop's event loop factory if enabled, otherwise None (default loop)."""
+    if "uvloop" in active:
+        return uvloop.new_event_loop
+    return None
@@ -13,6 +13,7 @@ Description:
 import argparse
 import json
 from utils.logger import logger
+from utils.speedups import json_loads
 
 
 def parse_args():
@@ -26,12 +27,22 @@ def parse_args():
         "--stream", "-s", help="Enable console stream", action="store_true"
     )
     parser.add_argument(
-        "--env", help="Path to the .env file (default: .env)", default=".env"
+        "--env",
+        help="Path to the .env file, several paths run several bots in one process (default: .env)",
+        nargs="+",
+        default=[".env"],
     )
     parser.add_argument(
         "--config",
-        help="Path to the config.json file (default: utils/config.json)",
-        default="utils/config.json",
+        help="Path to the config.json file, paired with --env in order, "
+        "the last one is reused for the remaining bots (default: utils/config.json)",
+        nargs="+",
+        default=["utils/config.json"],
+    )
+    parser.add_argument(
+        "--fast",
+        help="Use uvloop and orjson if they are installed",
+        action="store_true",
     )
     parser.add_argument(
         "--logs-path",
@@ -41,19 +52,19 @@ def parse_args():
     return parser.parse_args()
 
 
-def load_config_file(path: str = "utils/config.json") -> dict:
+def load_config_file(path: str = "utils/config.json") -> dict | None:
     """
     Loads a JSON configuration file containing the bot settings.
 
     :param path: Path to the configuration file. Default: ‘utils/config.json’.
-    :return dict: File contents as a dictionary or empty dictionary in case of error.
+    :return dict: File contents as a dictionary or None in case of error.
     """
     try:
-        with open(path) as json_file:
+        with open(path, "rb") as json_file:
             logger.info(f"Loading config from {path}")
-            return json.load(json_file)
+            return json_loads(json_file.read())
     except FileNotFoundError:
         logger.warning(f"Config file not found: {path}")
     except json.JSONDecodeError:
         logger.warning(f"Config file does not contain valid JSON: {path}")
-    return {}
+    return None